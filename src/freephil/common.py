@@ -2,18 +2,19 @@
 
 "Documentation: https://cctbx.github.io/libtbx/libtbx.phil.html"
 
-import io
+import collections
+import collections.abc
+import functools
 import math
 import os
+import re
 import sys
 import textwrap
+import threading
 import tokenize as python_tokenize
 import warnings
-import weakref
 from itertools import count
 
-import pkg_resources
-
 import freephil
 
 from . import adapter, parser, tokenizer
@@ -65,15 +66,18 @@ class _import_python_object:
                 % (error_prefix, import_path, target_must_be, where_str)
             )
         module_path = ".".join(path_elements[:-1])
-        try:
-            module = __import__(module_path)
-        except ImportError:
-            raise ImportError(
-                "%sno module %s%s or possibly import errors in "
-                "module %s" % (error_prefix, module_path, where_str, module_path)
-            )
-        for attr in path_elements[1:-1]:
-            module = getattr(module, attr)
+        # modules that are already imported need no __import__ round trip
+        module = sys.modules.get(module_path)
+        if module is None:
+            try:
+                module = __import__(module_path)
+            except ImportError:
+                raise ImportError(
+                    "%sno module %s%s or possibly import errors in "
+                    "module %s" % (error_prefix, module_path, where_str, module_path)
+                )
+            for attr in path_elements[1:-1]:
+                module = getattr(module, attr)
         try:
             self.object = getattr(module, path_elements[-1])
         except AttributeError:
@@ -86,12 +90,18 @@ class _import_python_object:
         self.module = module
 
 
+@functools.lru_cache(maxsize=4096)
 def is_reserved_identifier(string):
     if len(string) < 5:
         return False
     return string.startswith("__") and string.endswith("__")
 
 
+@functools.lru_cache(maxsize=4096)
+def _has_include_component(name):
+    return "include" in name.split(".")
+
+
 def get_converters_phil_type(converters):
     result = getattr(converters, "phil_type", None)
     if result is None:
@@ -108,23 +118,84 @@ def extended_converter_registry(additional_converters, base_registry=None):
     return result
 
 
-default_converter_registry = extended_converter_registry(
-    additional_converters=[
-        words_converters,
-        strings_converters,
-        str_converters,
-        qstr_converters,
-        path_converters,
-        key_converters,
-        bool_converters,
-        int_converters,
-        float_converters,
-        ints_converters,
-        floats_converters,
-        choice_converters,
-    ]
-    + [e.load() for e in pkg_resources.iter_entry_points("freephil.converter")],
-    base_registry={},
+def _converter_entry_points():
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        import pkg_resources
+
+        return pkg_resources.iter_entry_points("freephil.converter")
+    all_entry_points = entry_points()
+    if hasattr(all_entry_points, "select"):
+        return all_entry_points.select(group="freephil.converter")
+    return all_entry_points.get("freephil.converter", [])
+
+
+class _lazy_converter_registry(collections.abc.MutableMapping):
+    """
+    Converter registry that defers importing the converters registered by
+    other packages through the "freephil.converter" entry point until the
+    registry is first used. Plugins may override built-in converters, so
+    they are loaded before any lookup or assignment is handled.
+    """
+
+    def __init__(self, builtin_registry):
+        self._registry = builtin_registry
+        self._plugins_loaded = False
+
+    def _load_plugins(self):
+        if self._plugins_loaded:
+            return
+        # a plugin that fails to import raises again on the next lookup
+        self._registry = extended_converter_registry(
+            additional_converters=[e.load() for e in _converter_entry_points()],
+            base_registry=self._registry,
+        )
+        self._plugins_loaded = True
+
+    def __getitem__(self, key):
+        self._load_plugins()
+        return self._registry[key]
+
+    def __setitem__(self, key, value):
+        self._load_plugins()
+        self._registry[key] = value
+
+    def __delitem__(self, key):
+        self._load_plugins()
+        del self._registry[key]
+
+    def __iter__(self):
+        self._load_plugins()
+        return iter(self._registry)
+
+    def __len__(self):
+        self._load_plugins()
+        return len(self._registry)
+
+    def copy(self):
+        self._load_plugins()
+        return dict(self._registry)
+
+
+default_converter_registry = _lazy_converter_registry(
+    extended_converter_registry(
+        additional_converters=[
+            words_converters,
+            strings_converters,
+            str_converters,
+            qstr_converters,
+            path_converters,
+            key_converters,
+            bool_converters,
+            int_converters,
+            float_converters,
+            ints_converters,
+            floats_converters,
+            choice_converters,
+        ],
+        base_registry={},
+    )
 )
 
 
@@ -132,13 +203,36 @@ def extract_args(*args, **keyword_args):
     return args, keyword_args
 
 
+# Tokens of a .type= or .call= expression: comments, (prefixed) string
+# literals, numbers, identifiers, and any other single non-space character.
+_CALL_EXPR_TOK = re.compile(
+    r"""#[^\r\n]*"""
+    r"""|(?:[bBrRuUfF]{1,2})?(?:'''(?:[^\\]|\\.)*?'''|\"\"\"(?:[^\\]|\\.)*?\"\"\""""
+    r"""|'''|\"\"\""""
+    r"""|'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")"""
+    r"""|0[xXoObB][0-9a-fA-F_]+"""
+    r"""|(?:\d[\d_]*(?:\.[\d_]*)?|\.\d[\d_]*)(?:[eE][+-]?\d[\d_]*)?[jJ]?"""
+    r"""|[^\W\d]\w*"""
+    r"""|\S"""
+)
+
+
+@functools.lru_cache(maxsize=4096)
 def normalize_call_expression(expression):
     result = []
     p = ""
-    for info in python_tokenize.generate_tokens(io.StringIO(expression).readline):
-        t = info[1]
-        if len(t) == 0:
-            continue
+    depth = 0
+    for match in _CALL_EXPR_TOK.finditer(expression):
+        t = match.group()
+        if t in "([{":
+            depth += 1
+        elif t in ")]}":
+            depth -= 1
+        elif t.lstrip("bBrRuUfF") in ("'''", '"""'):
+            raise python_tokenize.TokenError(
+                "EOF in multi-line string",
+                (expression.count("\n", 0, match.start()) + 1, match.start()),
+            )
         if (
             t != "."
             and t[0] in standard_identifier_start_characters
@@ -151,15 +245,48 @@ def normalize_call_expression(expression):
         if t[0] == ",":
             result.append(" ")
         p = t
+    if depth != 0:
+        # unbalanced brackets, reported like the tokenize module does
+        raise python_tokenize.TokenError(
+            "EOF in multi-line statement", (expression.count("\n") + 2, 0)
+        )
     return "".join(result)
 
 
+# The converter cache is a dict of the most recently used converter instances,
+# keyed by raw and normalized .type= expressions, in least recently used first
+# order. One type may take two entries, so this holds at least 256 types.
+_converter_cache_size = 512
+
+
+def _cache_converters(converter_cache, call_expression, converters_instance):
+    converter_cache.pop(call_expression, None)
+    converter_cache[call_expression] = converters_instance
+    if len(converter_cache) > _converter_cache_size:
+        del converter_cache[next(iter(converter_cache))]
+
+
+def _call_expression_from_words(words):
+    # str_from_words(words).strip() for words that are known not to be a plain
+    # None or Auto; callers check for those first
+    return " ".join([word.value for word in words]).strip()
+
+
 def definition_converters_from_words(words, converter_registry, converter_cache):
-    if is_plain_none(words=words):
-        return None
-    if is_plain_auto(words=words):
-        return freephil.Auto
-    call_expression_raw = str_from_words(words).strip()
+    # inlined is_plain_none(words) and is_plain_auto(words)
+    if len(words) == 1 and words[0].quote_token is None:
+        value = words[0].value.lower()
+        if value == "none":
+            return None
+        if value == "auto":
+            return freephil.Auto
+    call_expression_raw = _call_expression_from_words(words)
+    # Normalization is idempotent, so raw and normalized expressions can share
+    # the cache: a raw string equal to a normalized one names the same type.
+    converters_instance = converter_cache.pop(call_expression_raw, None)
+    if converters_instance is not None:
+        converter_cache[call_expression_raw] = converters_instance
+        return converters_instance
     try:
         call_expression = normalize_call_expression(expression=call_expression_raw)
     except python_tokenize.TokenError as e:
@@ -167,11 +294,11 @@ def definition_converters_from_words(words, converter_registry, converter_cache)
             'Error evaluating definition type "%s": %s%s'
             % (call_expression_raw, str(e), words[0].where_str())
         )
-    converters_weakref = converter_cache.get(call_expression, None)
-    if converters_weakref is not None:
-        converters_instance = converters_weakref()
-        if converters_instance is not None:
-            return converters_instance
+    converters_instance = converter_cache.pop(call_expression, None)
+    if converters_instance is not None:
+        converter_cache[call_expression] = converters_instance
+        _cache_converters(converter_cache, call_expression_raw, converters_instance)
+        return converters_instance
     flds = call_expression.split("(", 1)
     converters = converter_registry.get(flds[0], None)
     if converters is not None:
@@ -227,7 +354,8 @@ def definition_converters_from_words(words, converter_registry, converter_cache)
                 f'Error constructing definition type "%s": {e.__class__.__name__}: {e!s}%s'
                 % (call_expression, words[0].where_str())
             )
-    converter_cache[call_expression] = weakref.ref(converters_instance)
+    _cache_converters(converter_cache, call_expression, converters_instance)
+    _cache_converters(converter_cache, call_expression_raw, converters_instance)
     return converters_instance
 
 
@@ -266,6 +394,65 @@ def alias_path(self):
     return ".".join(result)
 
 
+def _show_plain_attribute(append, prefix, name, value, print_width):
+    append(f"{prefix}  .{name} = {value}\n")
+
+
+def _show_text_attribute(append, prefix, name, value, print_width):
+    if not isinstance(value, str):
+        _show_plain_attribute(append, prefix, name, value, print_width)
+        return
+    indent_len = len(prefix) + 3 + len(name) + 3
+    # cheapest checks first: short identifiers are emitted without quoting
+    if indent_len + len(value) < print_width and is_standard_identifier(value):
+        append(f"{prefix}  .{name} = {value}\n")
+        return
+    value = str(tokenizer.word(value=value, quote_token='"'))
+    if indent_len + len(value) < print_width:
+        append(f"{prefix}  .{name} = {value}\n")
+        return
+    indent = " " * indent_len
+    is_first = True
+    for block in textwrap.wrap(value[1:-1], width=print_width - 2 - indent_len):
+        if is_first:
+            append(f'{prefix}  .{name} = "{block}"\n')
+            is_first = False
+        else:
+            append(f'{indent}"{block}"\n')
+
+
+# Attributes that are never strings; all others may need quoting and wrapping
+_show_attribute_formatters = {
+    "optional": _show_plain_attribute,
+    "multiple": _show_plain_attribute,
+    "disable_add": _show_plain_attribute,
+    "disable_delete": _show_plain_attribute,
+    "type": _show_plain_attribute,
+    "call": _show_plain_attribute,
+    "input_size": _show_plain_attribute,
+    "expert_level": _show_plain_attribute,
+}
+
+
+def _attribute_lines(self, lines, prefix, attributes_level, print_width):
+    if attributes_level <= 0:
+        return
+    append = lines.append
+    get_formatter = _show_attribute_formatters.get
+    for name in self.attribute_names:
+        value = getattr(self, name)
+        if value is None:
+            if attributes_level > 2 and name != "alias" and name != "deprecated":
+                _show_plain_attribute(append, prefix, name, value, print_width)
+            continue
+        if name == "deprecated" and not value:
+            continue  # only show .deprecated if True
+        if attributes_level > 1 or name == "help" or name == "alias":
+            get_formatter(name, _show_text_attribute)(
+                append, prefix, name, value, print_width
+            )
+
+
 def show_attributes(self, out, prefix, attributes_level, print_width):
     """
     Prints attributes of the Phil object (scope or definition) to a file
@@ -282,51 +469,32 @@ def show_attributes(self, out, prefix, attributes_level, print_width):
     :type print_width: int
 
     """
-    if attributes_level <= 0:
-        return
-    for name in self.attribute_names:
-        value = getattr(self, name)
-        if (name == "deprecated") and (not value):
-            continue  # only show .deprecated if True
-        if (
-            (name == "help" and value is not None)
-            or (name == "alias" and value is not None)
-            or (value is not None and attributes_level > 1)
-            or attributes_level > 2
-        ):
-            if (name == "alias") and (value is None):
-                continue
-            if not isinstance(value, str):
-                # Python 2.2 workaround
-                if name in ["optional", "multiple", "disable_add", "disable_delete"]:
-                    if value is False:
-                        value = "False"
-                    elif value is True:
-                        value = "True"
-                print(prefix + "  ." + name, "=", value, file=out)
-            else:
-                indent = " " * (len(prefix) + 3 + len(name) + 3)
-                fits_on_one_line = len(indent + value) < print_width
-                if not is_standard_identifier(value) or not fits_on_one_line:
-                    value = str(tokenizer.word(value=value, quote_token='"'))
-                    fits_on_one_line = len(indent + value) < print_width
-                if fits_on_one_line:
-                    print(prefix + "  ." + name, "=", value, file=out)
-                else:
-                    is_first = True
-                    for block in textwrap.wrap(
-                        value[1:-1], width=print_width - 2 - len(indent)
-                    ):
-                        if is_first:
-                            print(
-                                prefix + "  ." + name, "=", '"' + block + '"', file=out
-                            )
-                            is_first = False
-                        else:
-                            print(indent + '"' + block + '"', file=out)
+    lines = []
+    _attribute_lines(
+        self,
+        lines,
+        prefix=prefix,
+        attributes_level=attributes_level,
+        print_width=print_width,
+    )
+    if lines:
+        out.write("".join(lines))
+
+
+class _list_writer:
+    """File-like sink collecting written strings, joined once by the caller"""
+
+    __slots__ = ["chunks", "write"]
+
+    def __init__(self):
+        self.chunks = []
+        self.write = self.chunks.append
 
 
 class object_locator:
+
+    __slots__ = ["parent", "path", "object"]
+
     def __init__(self, parent, path, object):
         self.parent = parent
         self.path = path
@@ -343,23 +511,49 @@ class object_locator:
 
 
 class try_tokenize_proxy:
+
+    __slots__ = ["error_message", "tokenized"]
+
     def __init__(self, error_message, tokenized):
         self.error_message = error_message
         self.tokenized = tokenized
 
 
 class try_extract_proxy:
+
+    __slots__ = ["error_message", "extracted"]
+
     def __init__(self, error_message, extracted):
         self.error_message = error_message
         self.extracted = extracted
 
 
 class try_format_proxy:
+
+    __slots__ = ["error_message", "formatted"]
+
     def __init__(self, error_message, formatted):
         self.error_message = error_message
         self.formatted = formatted
 
 
+def _same_word_values(words, other_words):
+    if words is other_words:
+        return True
+    if len(words) != len(other_words):
+        return False
+    for word, other_word in zip(words, other_words):
+        if word is not other_word and (
+            word.value != other_word.value or word.quote_token != other_word.quote_token
+        ):
+            return False
+    return True
+
+
+# types for which fetch_diff may compare words instead of formatted values
+_diff_by_words_phil_types = frozenset(["str", "int", "float", "bool", "choice"])
+
+
 class definition(slots_getstate_setstate):
     """
     One line definitions used in Phil objects. The class is usually
@@ -427,6 +621,9 @@ class definition(slots_getstate_setstate):
         "deprecated",
         "alias",
     ]
+    _attribute_names_set = frozenset(attribute_names)
+    _bool_attribute_names = frozenset(["optional", "multiple"])
+    _int_attribute_names = frozenset(["input_size", "expert_level"])
 
     __slots__ = [
         "name",
@@ -440,6 +637,9 @@ class definition(slots_getstate_setstate):
         "tmp",
     ] + attribute_names
 
+    # pickled/copied state, in a fixed order
+    _state_slots = tuple(__slots__)
+
     def __init__(
         self,
         name,
@@ -463,11 +663,13 @@ class definition(slots_getstate_setstate):
         deprecated=None,
         alias=None,
     ):
-        if is_reserved_identifier(name):
+        # inlined is_reserved_identifier(name)
+        if name[:2] == "__" and name[-2:] == "__" and len(name) >= 5:
             raise RuntimeError(f'Reserved identifier: "{name}"{where_str}')
-        if name != "include" and "include" in name.split("."):
+        if name != "include" and _has_include_component(name):
             raise RuntimeError('Reserved identifier: "include"%s' % where_str)
-        self.name = name
+        # names come from a small vocabulary and are compared very often
+        self.name = sys.intern(name)
         self.words = words
         self.primary_id = primary_id
         self.primary_parent_scope = primary_parent_scope
@@ -488,11 +690,19 @@ class definition(slots_getstate_setstate):
         self.deprecated = deprecated
         self.alias = alias
 
-    def __setstate__(self, *args, **kwds):
-        slots_getstate_setstate.__setstate__(self, *args, **kwds)
-        # XXX backwards compatibility 2012-03-27
-        if not hasattr(self, "deprecated"):
-            setattr(self, "deprecated", None)
+    def __getstate__(self):
+        return tuple([getattr(self, name) for name in self._state_slots])
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # pickles written before the tuple state was introduced
+            slots_getstate_setstate.__setstate__(self, state)
+            # XXX backwards compatibility 2012-03-27
+            if not hasattr(self, "deprecated"):
+                setattr(self, "deprecated", None)
+        else:
+            for name, value in zip(self._state_slots, state):
+                setattr(self, name, value)
 
     def copy(self):
         """
@@ -500,10 +710,9 @@ class definition(slots_getstate_setstate):
 
         :rtype: freephil.definition
         """
-        keyword_args = {}
-        for keyword in self.__slots__:
-            keyword_args[keyword] = getattr(self, keyword)
-        return definition(**keyword_args)
+        result = definition.__new__(definition)
+        result.__setstate__(self.__getstate__())
+        return result
 
     def customized_copy(self, name=None, words=None):
         """
@@ -556,6 +765,8 @@ class definition(slots_getstate_setstate):
         if self.deprecated:
             # issue warning if value is not the default, otherwise return None so
             # this parameter stays invisible to users
+            if _same_word_values(source.words, self.words):
+                return None
             result_as_str = strings_from_words(source.words)
             self_as_str = strings_from_words(self.words)
             if result_as_str != self_as_str:
@@ -591,8 +802,19 @@ class definition(slots_getstate_setstate):
             diff_mode=True,
             skip_incompatible_objects=skip_incompatible_objects,
         )
-        result_as_str = self.extract_format(source=result).as_str()
+        # always validates the master value, even if the result is unchanged
         self_as_str = self.extract_format().as_str()
+        if result is None:
+            return None
+        if self.type is None or (
+            getattr(self.type, "phil_type", None) in _diff_by_words_phil_types
+        ):
+            # identical words of a built-in type extract and format identically
+            if [str(word) for word in result.words] == [
+                str(word) for word in self.words
+            ]:
+                return None
+        result_as_str = self.extract_format(source=result).as_str()
         if result_as_str == self_as_str:
             result = None
         return result
@@ -625,11 +847,11 @@ class definition(slots_getstate_setstate):
         :type name: str
         :rtype: bool
         """
-        return name in self.attribute_names
+        return name in self._attribute_names_set
 
     def assign_attribute(self, name, words, converter_registry, converter_cache):
         assert self.has_attribute_with_name(name)
-        if name in ["optional", "multiple"]:
+        if name in self._bool_attribute_names:
             value = bool_from_words(words=words, path="." + name)
         elif name == "type":
             value = definition_converters_from_words(
@@ -637,7 +859,7 @@ class definition(slots_getstate_setstate):
                 converter_registry=converter_registry,
                 converter_cache=converter_cache,
             )
-        elif name in ["input_size", "expert_level"]:
+        elif name in self._int_attribute_names:
             value = int_from_words(words=words, path="." + name)
         else:
             value = str_from_words(words)
@@ -691,23 +913,31 @@ class definition(slots_getstate_setstate):
         if self.name != "include":
             line += " ="
         indent = " " * len(line)
+        lines = []
         if self.deprecated:
-            print(prefix + "# WARNING: deprecated parameter", file=out)
-        for word in self.words:
-            line_plus = line + " " + str(word)
-            if len(line_plus) > print_width - 2 and len(line) > len(indent):
-                print(line + " \\", file=out)
-                line = indent + " " + str(word)
-            else:
-                line = line_plus
-        print(line, file=out)
-        show_attributes(
-            self=self,
-            out=out,
+            lines.append(prefix + "# WARNING: deprecated parameter\n")
+        indent_len = len(indent)
+        line_len = len(line)
+        line_parts = [line]
+        for word_str in map(str, self.words):
+            if line_len + 1 + len(word_str) > print_width - 2 and line_len > indent_len:
+                line_parts.append(" \\\n")
+                lines.append("".join(line_parts))
+                line_parts = [indent]
+                line_len = indent_len
+            line_parts.append(" ")
+            line_parts.append(word_str)
+            line_len += 1 + len(word_str)
+        line_parts.append("\n")
+        lines.append("".join(line_parts))
+        _attribute_lines(
+            self,
+            lines,
             prefix=prefix,
             attributes_level=attributes_level,
             print_width=print_width,
         )
+        out.write("".join(lines))
 
     def as_str(
         self, prefix="", expert_level=None, attributes_level=0, print_width=None
@@ -726,7 +956,7 @@ class definition(slots_getstate_setstate):
         :return: Pretty print of the definition
         :rtype: str
         """
-        out = io.StringIO()
+        out = _list_writer()
         self.show(
             out=out,
             prefix=prefix,
@@ -734,20 +964,7 @@ class definition(slots_getstate_setstate):
             attributes_level=attributes_level,
             print_width=print_width,
         )
-        return out.getvalue()
-
-    def _all_definitions(
-        self, suppress_multiple, select_tmp, parent, parent_path, result
-    ):
-        if suppress_multiple and self.multiple:
-            return
-        if select_tmp is not None and not (self.tmp == select_tmp):
-            return
-        if self.name == "include":
-            return
-        result.append(
-            object_locator(parent=parent, path=parent_path + self.name, object=self)
-        )
+        return "".join(out.chunks)
 
     def get_without_substitution(self, path, alias_path=None):
         if self.is_disabled or (
@@ -873,15 +1090,14 @@ class definition(slots_getstate_setstate):
     def resolve_variables(self, diff_mode=False):
         new_words = []
         for word in self.words:
-            if word.quote_token == "'":
+            if word.quote_token == "'" or "$" not in word.value:
+                # nothing to substitute
                 new_words.append(word)
                 continue
             substitution_proxy = variable_substitution_proxy(word)
             for fragment in substitution_proxy.fragments:
                 if not fragment.is_variable:
-                    fragment.result = tokenizer.word(
-                        value=fragment.value, quote_token='"'
-                    )
+                    # literal text is joined by value in get_new_words()
                     continue
                 variable_words = None
                 if self.primary_parent_scope is not None:
@@ -900,7 +1116,7 @@ class definition(slots_getstate_setstate):
                     if diff_mode:
                         env_var = "$" + fragment.value
                     else:
-                        env_var = os.environ.get(fragment.value, None)
+                        env_var = _environ_get(fragment.value)
                     if env_var is not None:
                         variable_words = [
                             tokenizer.word(
@@ -926,7 +1142,7 @@ class definition(slots_getstate_setstate):
 
 class scope_extract_call_proxy_object:
     def __init__(self, where_str, expression, callable, keyword_args):
-        self.where_str = where_str
+        self.where_str = sys.intern(where_str) if where_str else where_str
         self.expression = expression
         self.callable = callable
         self.keyword_args = keyword_args
@@ -940,7 +1156,10 @@ def scope_extract_call_proxy(full_path, words, cache):
         return None
     if is_plain_auto(words=words):
         return freephil.Auto
-    call_expression_raw = str_from_words(words).strip()
+    call_expression_raw = _call_expression_from_words(words)
+    call_proxy = cache.get(call_expression_raw, None)
+    if call_proxy is not None:
+        return call_proxy
     try:
         call_expression = normalize_call_expression(expression=call_expression_raw)
     except python_tokenize.TokenError as e:
@@ -984,6 +1203,7 @@ def scope_extract_call_proxy(full_path, words, cache):
             keyword_args=keyword_args,
         )
         cache[call_expression] = call_proxy
+    cache[call_expression_raw] = call_proxy
     return call_proxy
 
 
@@ -995,6 +1215,12 @@ class scope_extract_is_disabled:
     pass
 
 
+# Bookkeeping keys always present in (or cached into) a scope_extract __dict__
+_scope_extract_reserved_keys = frozenset(
+    ["__phil_name__", "__phil_parent__", "__phil_call__", "__phil_path_cache__"]
+)
+
+
 class scope_extract_list(list):
     def __init__(self, optional):
         self.__phil_optional__ = optional
@@ -1032,20 +1258,24 @@ class scope_extract:
 
 
         """
-        if (
-            self.__phil_parent__ is None
-            or self.__phil_parent__.__phil_name__ is None
-            or self.__phil_parent__.__phil_name__ == ""
-        ):
-            if object_name is None:
-                return self.__phil_name__
-            elif self.__phil_name__ is None or self.__phil_name__ == "":
-                return object_name
-            return self.__phil_name__ + "." + object_name
-        result = [self.__phil_parent__.__phil_path__(), self.__phil_name__]
-        if object_name is not None:
-            result.append(object_name)
-        return ".".join(result)
+        # the parent chain never changes, so the path is computed only once
+        path = self.__dict__.get("__phil_path_cache__", scope_extract_attribute_error)
+        if path is scope_extract_attribute_error:
+            parent = self.__phil_parent__
+            if (
+                parent is None
+                or parent.__phil_name__ is None
+                or parent.__phil_name__ == ""
+            ):
+                path = self.__phil_name__
+            else:
+                path = parent.__phil_path__() + "." + self.__phil_name__
+            object.__setattr__(self, "__phil_path_cache__", path)
+        if object_name is None:
+            return path
+        if path is None or path == "":
+            return object_name
+        return path + "." + object_name
 
     def __phil_path_and_value__(self, object_name):
         """
@@ -1059,8 +1289,11 @@ class scope_extract:
         return (self.__phil_path__(object_name=object_name), getattr(self, object_name))
 
     def __setattr__(self, name, value):
+        # instance attributes are the common case; getattr also finds
+        # class attributes
         if (
-            getattr(self, name, scope_extract_attribute_error)
+            name not in self.__dict__
+            and getattr(self, name, scope_extract_attribute_error)
             is scope_extract_attribute_error
         ):
             pp = self.__phil_path__()
@@ -1086,7 +1319,8 @@ class scope_extract:
         :raises AttributeError: When attribute already exists
         """
         if (
-            getattr(self, name, scope_extract_attribute_error)
+            name in self.__dict__
+            or getattr(self, name, scope_extract_attribute_error)
             is not scope_extract_attribute_error
         ):
             pp = self.__phil_path__()
@@ -1105,16 +1339,14 @@ class scope_extract:
         :type other: freephil.scope_extract
         """
         for key, other_value in other.__dict__.items():
-            if is_reserved_identifier(key):
+            if key in _scope_extract_reserved_keys or is_reserved_identifier(key):
                 continue
             self_value = self.__dict__.get(key, None)
             if self_value is None:
                 self.__dict__[key] = other_value
             elif isinstance(self_value, scope_extract_list):
                 assert isinstance(other_value, scope_extract_list)
-                for item in other_value:
-                    if item is not None:
-                        self_value.append(item)
+                self_value.extend([item for item in other_value if item is not None])
                 if len(self_value) > 1 and self_value[0] is None:
                     del self_value[0]
             else:
@@ -1157,8 +1389,10 @@ class scope_extract:
             raise RuntimeError('scope "%s" is not callable.' % self.__phil_path__())
         if len(keyword_args) == 0:
             return call_proxy.callable(self, **call_proxy.keyword_args)
-        effective_keyword_args = dict(call_proxy.keyword_args)
-        effective_keyword_args.update(keyword_args)
+        if call_proxy.keyword_args:
+            effective_keyword_args = {**call_proxy.keyword_args, **keyword_args}
+        else:
+            effective_keyword_args = keyword_args
         try:
             return call_proxy.callable(self, **effective_keyword_args)
         except Exception as e:
@@ -1172,6 +1406,62 @@ class scope_extract:
             )
 
 
+# os.environ.get() results, filled on demand and shared by all variable
+# substitutions of one scope.fetch() in the current thread
+_environ_lookups = threading.local()
+
+
+def _environ_get(name):
+    lookups = getattr(_environ_lookups, "values", None)
+    if lookups is None:
+        return os.environ.get(name, None)
+    try:
+        return lookups[name]
+    except KeyError:
+        value = lookups[name] = os.environ.get(name, None)
+        return value
+
+
+def _with_environ_lookups(method):
+    @functools.wraps(method)
+    def wrapper(*args, **keyword_args):
+        if getattr(_environ_lookups, "values", None) is not None:
+            return method(*args, **keyword_args)
+        _environ_lookups.values = {}
+        try:
+            return method(*args, **keyword_args)
+        finally:
+            _environ_lookups.values = None
+
+    return wrapper
+
+
+# Converters for scope.assign_attribute, keyed by attribute name
+def _scope_bool_attribute(self, name, words, call_proxy_cache):
+    return bool_from_words(words, path="." + name)
+
+
+def _scope_int_attribute(self, name, words, call_proxy_cache):
+    return int_from_words(words=words, path="." + name)
+
+
+def _scope_call_attribute(self, name, words, call_proxy_cache):
+    return scope_extract_call_proxy(
+        full_path=self.full_path(), words=words, cache=call_proxy_cache
+    )
+
+
+def _scope_str_attribute(self, name, words, call_proxy_cache):
+    return str_from_words(words)
+
+
+def _scope_sequential_format_attribute(self, name, words, call_proxy_cache):
+    value = str_from_words(words)
+    if value is not None:
+        assert isinstance(value % 0, str)
+    return value
+
+
 class scope(slots_getstate_setstate):
     """
     Phil object. It should not be created by an user directly, but
@@ -1251,6 +1541,16 @@ class scope(slots_getstate_setstate):
         "expert_level",
         "alias",
     ]
+    _attribute_names_set = frozenset(attribute_names)
+    _attribute_converters = {
+        "optional": _scope_bool_attribute,
+        "multiple": _scope_bool_attribute,
+        "disable_add": _scope_bool_attribute,
+        "disable_delete": _scope_bool_attribute,
+        "expert_level": _scope_int_attribute,
+        "call": _scope_call_attribute,
+        "sequential_format": _scope_sequential_format_attribute,
+    }
 
     __slots__ = [
         "name",
@@ -1286,13 +1586,16 @@ class scope(slots_getstate_setstate):
         expert_level=None,
         alias=None,
     ):
-        self.name = name
+        # names and source locations repeat heavily across a parsed tree
+        self.name = sys.intern(name)
+        if objects is None:
+            objects = []
         self.objects = objects
         self.primary_id = primary_id
         self.primary_parent_scope = primary_parent_scope
         self.is_disabled = is_disabled
         self.is_template = is_template
-        self.where_str = where_str
+        self.where_str = sys.intern(where_str) if where_str else where_str
         self.merge_names = merge_names
         self.style = style
         self.help = help
@@ -1306,11 +1609,9 @@ class scope(slots_getstate_setstate):
         self.disable_delete = disable_delete
         self.expert_level = expert_level
         self.alias = alias
-        if objects is None:
-            self.objects = []
         if is_reserved_identifier(name):
             raise RuntimeError(f'Reserved identifier: "{name}"{where_str}')
-        if "include" in name.split("."):
+        if _has_include_component(name):
             raise RuntimeError('Reserved identifier: "include"%s' % where_str)
         if sequential_format is not None:
             assert isinstance(sequential_format % 0, str)
@@ -1321,10 +1622,7 @@ class scope(slots_getstate_setstate):
 
         :rtype: freephil.scope
         """
-        keyword_args = {}
-        for keyword in self.__slots__:
-            keyword_args[keyword] = getattr(self, keyword)
-        return scope(**keyword_args)
+        return self._fast_clone()
 
     def customized_copy(self, name=None, objects=None):
         """
@@ -1337,7 +1635,7 @@ class scope(slots_getstate_setstate):
         :return: Customized object copy
         :rtype: freephil.scope
         """
-        result = self.copy()
+        result = self._fast_clone()
         if name is not None:
             result.name = name
         if objects is not None:
@@ -1345,6 +1643,20 @@ class scope(slots_getstate_setstate):
         result.is_template = 0
         return result
 
+    def _fast_clone(self):
+        # slot-by-slot copy that skips the validation in __init__,
+        # which self has already passed
+        return scope._from_slots([getattr(self, keyword) for keyword in self.__slots__])
+
+    @classmethod
+    def _from_slots(cls, slot_values):
+        # trusted constructor: slot_values must be in __slots__ order and
+        # come from an already validated scope
+        result = cls.__new__(cls)
+        for keyword, value in zip(cls.__slots__, slot_values):
+            setattr(result, keyword, value)
+        return result
+
     def is_empty(self):
         """
         :return: True, if object is empty
@@ -1430,12 +1742,18 @@ class scope(slots_getstate_setstate):
         """
 
         objects = []
-        for object in self.objects:
-            obj = object.copy()
-            obj.primary_parent_scope = new_value
-            if obj.is_scope:
-                obj = obj.change_primary_parent_scope(obj)
-            objects.append(obj)
+        # (objects to copy, their new parent, list receiving the copies)
+        stack = [(self.objects, new_value, objects)]
+        while stack:
+            source_objects, parent, target = stack.pop()
+            for object in source_objects:
+                obj = object.copy()
+                obj.primary_parent_scope = parent
+                if obj.is_scope:
+                    children = []
+                    stack.append((obj.objects, obj, children))
+                    obj = obj.customized_copy(objects=children)
+                target.append(obj)
         return self.customized_copy(objects=objects)
 
     def has_attribute_with_name(self, name):
@@ -1446,29 +1764,14 @@ class scope(slots_getstate_setstate):
         :return: True, if attribute exists in the scope
         :rtype: bool
         """
-        return name in self.attribute_names
+        return name in self._attribute_names_set
 
     def assign_attribute(self, name, words, scope_extract_call_proxy_cache):
         assert self.has_attribute_with_name(name)
-        if name in ["optional", "multiple", "disable_add", "disable_delete"]:
-            value = bool_from_words(words, path="." + name)
-        elif name == "expert_level":
-            value = int_from_words(words=words, path="." + name)
-        elif name == "call":
-            value = scope_extract_call_proxy(
-                full_path=self.full_path(),
-                words=words,
-                cache=scope_extract_call_proxy_cache,
-            )
-        else:
-            value = str_from_words(words)
-            if name == "style":
-                style = value
-            elif name == "sequential_format":
-                sequential_format = value
-                if sequential_format is not None:
-                    assert isinstance(sequential_format % 0, str)
-        setattr(self, name, value)
+        converter = self._attribute_converters.get(name, _scope_str_attribute)
+        setattr(
+            self, name, converter(self, name, words, scope_extract_call_proxy_cache)
+        )
 
     def active_objects(self):
         """
@@ -1479,6 +1782,14 @@ class scope(slots_getstate_setstate):
                 continue
             yield object
 
+    def active_objects_list(self):
+        """
+        List of active objects, built in a single pass
+
+        :rtype: list
+        """
+        return [object for object in self.objects if not object.is_disabled]
+
     def master_active_objects(self):
         names_object = {}
         for object in self.objects:
@@ -1541,6 +1852,19 @@ class scope(slots_getstate_setstate):
             out = sys.stdout
         if print_width is None:
             print_width = default_print_width
+        if not isinstance(out, _list_writer):
+            # collect the whole tree, then write it out in one call
+            writer = _list_writer()
+            self.show(
+                out=writer,
+                merged_names=merged_names,
+                prefix=prefix,
+                expert_level=expert_level,
+                attributes_level=attributes_level,
+                print_width=print_width,
+            )
+            out.write("".join(writer.chunks))
+            return
         is_proper_scope = False
         if len(self.name) == 0:
             assert len(merged_names) == 0
@@ -1552,23 +1876,22 @@ class scope(slots_getstate_setstate):
                 hash = "!"
             else:
                 hash = ""
-            out_attributes = io.StringIO()
-            show_attributes(
-                self=self,
-                out=out_attributes,
+            attribute_lines = []
+            _attribute_lines(
+                self,
+                attribute_lines,
                 prefix=prefix,
                 attributes_level=attributes_level,
                 print_width=print_width,
             )
-            out_attributes = out_attributes.getvalue()
             merged_name = ".".join(merged_names + [self.name])
             merged_names = []
-            if len(out_attributes) == 0:
-                print(prefix + hash + merged_name, "{", file=out)
+            if len(attribute_lines) == 0:
+                out.write(prefix + hash + merged_name + " {\n")
             else:
-                print(prefix + hash + merged_name, file=out)
-                out.write(out_attributes)
-                print(prefix + "{", file=out)
+                out.write(prefix + hash + merged_name + "\n")
+                out.chunks.extend(attribute_lines)
+                out.write(prefix + "{\n")
             prefix += "  "
         for object in self.objects:
             object.show(
@@ -1580,7 +1903,7 @@ class scope(slots_getstate_setstate):
                 print_width=print_width,
             )
         if is_proper_scope:
-            print(prefix[:-2] + "}", file=out)
+            out.write(prefix[:-2] + "}\n")
 
     def as_str(
         self, prefix="", expert_level=None, attributes_level=0, print_width=None
@@ -1597,7 +1920,7 @@ class scope(slots_getstate_setstate):
         :type print_width:  int
         :rtype: str
         """
-        out = io.StringIO()
+        out = _list_writer()
         self.show(
             out=out,
             prefix=prefix,
@@ -1605,51 +1928,55 @@ class scope(slots_getstate_setstate):
             attributes_level=attributes_level,
             print_width=print_width,
         )
-        return out.getvalue()
-
-    def _all_definitions(
-        self, suppress_multiple, select_tmp, parent, parent_path, result
-    ):
-        parent_path += self.name + "."
-        for object in self.active_objects():
-            if suppress_multiple and object.multiple:
-                continue
-            object._all_definitions(
-                suppress_multiple=suppress_multiple,
-                select_tmp=select_tmp,
-                parent=self,
-                parent_path=parent_path,
-                result=result,
-            )
+        return "".join(out.chunks)
 
     def all_definitions(self, suppress_multiple=False, select_tmp=None):
         result = []
-        for object in self.active_objects():
-            if suppress_multiple and object.multiple:
-                continue
-            object._all_definitions(
-                suppress_multiple=suppress_multiple,
-                select_tmp=select_tmp,
-                parent=self,
-                parent_path="",
-                result=result,
-            )
+        # depth-first walk with an explicit stack of (scope, path, iterator)
+        stack = [(self, "", iter(self.active_objects_list()))]
+        while stack:
+            parent, parent_path, objects = stack[-1]
+            for object in objects:
+                if suppress_multiple and object.multiple:
+                    continue
+                if object.is_scope:
+                    stack.append(
+                        (
+                            object,
+                            parent_path + object.name + ".",
+                            iter(object.active_objects_list()),
+                        )
+                    )
+                    break
+                if select_tmp is not None and not (object.tmp == select_tmp):
+                    continue
+                if object.name == "include":
+                    continue
+                result.append(
+                    object_locator(
+                        parent=parent, path=parent_path + object.name, object=object
+                    )
+                )
+            else:
+                stack.pop()
         return result
 
     def get_without_substitution(self, path, alias_path=None):
         if self.is_disabled:
             return []
-        if len(self.name) == 0:
+        name = self.name
+        name_length = len(name)
+        if name_length == 0:
             if len(path) == 0:
                 return self.objects
-        elif (self.name == path) or (self.name == alias_path):
+        elif (name == path) or (name == alias_path):
             return [self]
-        elif path.startswith(self.name + "."):
-            path = path[len(self.name) + 1 :]
+        elif path[name_length : name_length + 1] == "." and path.startswith(name):
+            path = path[name_length + 1 :]
         elif alias_path is not None:
             full_path = self.full_path()
             if full_path.startswith(alias_path):
-                path = path[len(self.name) + 1 :]
+                path = path[name_length + 1 :]
         else:
             return []
         result = []
@@ -1679,29 +2006,37 @@ class scope(slots_getstate_setstate):
             while self.primary_parent_scope is not None:
                 self = self.primary_parent_scope
             path = path[1:]
-        candidates = []
-        for object in self.objects:
-            if object.primary_id is not None and object.primary_id >= stop_id:
-                break
-            if object.is_definition:
-                if object.name == path:
+        path_length = len(path)
+        # walk up the enclosing scopes in a loop rather than by recursion
+        while True:
+            candidates = []
+            for object in self.objects:
+                if object.primary_id is not None and object.primary_id >= stop_id:
+                    break
+                name = object.name
+                if name == path:
                     candidates.append(object)
-            elif object.name == path or path.startswith(object.name + "."):
-                candidates.append(object)
-        while len(candidates) > 0:
-            object = candidates.pop()
-            if object.name == path:
-                return object
-            object = object.lexical_get(
-                path=path[len(object.name) + 1 :], stop_id=stop_id, search_up=False
-            )
-            if object is not None:
-                return object
-        if not search_up:
-            return None
-        if self.primary_parent_scope is None:
-            return None
-        return self.primary_parent_scope.lexical_get(path=path, stop_id=stop_id)
+                elif (
+                    not object.is_definition
+                    and len(name) < path_length
+                    and path[len(name)] == "."
+                    and path.startswith(name)
+                ):
+                    candidates.append(object)
+            while len(candidates) > 0:
+                object = candidates.pop()
+                if object.name == path:
+                    return object
+                object = object.lexical_get(
+                    path=path[len(object.name) + 1 :], stop_id=stop_id, search_up=False
+                )
+                if object is not None:
+                    return object
+            if not search_up:
+                return None
+            if self.primary_parent_scope is None:
+                return None
+            self = self.primary_parent_scope
 
     def extract(self, parent=None):
         """
@@ -1738,6 +2073,18 @@ class scope(slots_getstate_setstate):
         :return: Phil object
         :rtype:  freephil.scope
         """
+        # classify python_object once, not for every master object
+        python_objects = None
+        if python_object is None:
+            fixed_value = None
+        elif (python_object is freephil.Auto) or (
+            isinstance(python_object, type(freephil.Auto))
+        ):
+            fixed_value = freephil.Auto
+        elif isinstance(python_object, scope_extract):
+            python_objects = [python_object]
+        else:
+            python_objects = python_object
         multiple_scopes_done = {}
         result = []
         for object in self.master_active_objects():
@@ -1745,16 +2092,10 @@ class scope(slots_getstate_setstate):
                 if object.name in multiple_scopes_done:
                     continue
                 multiple_scopes_done[object.name] = False
-            if python_object is None:
-                result.append(object.format(None))
-            elif (python_object is freephil.Auto) or (
-                isinstance(python_object, type(freephil.Auto))
-            ):
-                result.append(object.format(freephil.Auto))
+            if python_objects is None:
+                result.append(object.format(fixed_value))
             else:
-                if isinstance(python_object, scope_extract):
-                    python_object = [python_object]
-                for python_object_i in python_object:
+                for python_object_i in python_objects:
                     sub_python_object = python_object_i.__phil_get__(object.name)
                     if sub_python_object is not scope_extract_attribute_error:
                         if not object.multiple:
@@ -1804,6 +2145,7 @@ class scope(slots_getstate_setstate):
             converter_registry=converter_registry,
         ).extract()
 
+    @_with_environ_lookups
     def fetch(
         self,
         source=None,
@@ -1856,6 +2198,17 @@ class scope(slots_getstate_setstate):
         del sources
         if track_unused_definitions:
             source.assign_tmp(value=False, active_only=True)
+        # Bucket the active source objects by name. For a plain master name
+        # without alias this gives the same matches as source.get(), unless a
+        # source name is empty or dotted (those need the general path walk).
+        source_by_name = None
+        if not source.is_disabled:
+            source_by_name = {}
+            for object in source.active_objects():
+                if object.name == "" or "." in object.name:
+                    source_by_name = None
+                    break
+                source_by_name.setdefault(object.name, []).append(object)
         result_objects = []
         for master_object in self.master_active_objects():
             if len(self.name) == 0:
@@ -1863,9 +2216,19 @@ class scope(slots_getstate_setstate):
             else:
                 path = self.name + "." + master_object.name
             alias_path = master_object.alias_path()
-            matching_sources = source.get(
-                path=path, with_substitution=False, alias_path=alias_path
-            )
+            if (
+                source_by_name is not None
+                and alias_path is None
+                and master_object.name != ""
+                and "." not in master_object.name
+            ):
+                matching_sources = scope(
+                    name="", objects=list(source_by_name.get(master_object.name, ()))
+                )
+            else:
+                matching_sources = source.get(
+                    path=path, with_substitution=False, alias_path=alias_path
+                )
             if not master_object.multiple:
                 if master_object.is_definition:
                     # loop over all matching_sources to support track_unused_definitions
@@ -1910,6 +2273,19 @@ class scope(slots_getstate_setstate):
                                     continue
                             elif candidate is None:
                                 continue
+                        if (
+                            master_object.is_definition
+                            and candidate is not None
+                            and candidate.type is master_object.type
+                            and (
+                                candidate.type is None
+                                or getattr(candidate.type, "phil_type", None)
+                                in _diff_by_words_phil_types
+                            )
+                            and _same_word_values(candidate.words, master_object.words)
+                        ):
+                            # same words of a built-in type: formats like the master
+                            continue
                         candidate_as_str = master_object.extract_format(
                             source=candidate
                         ).as_str()
@@ -2067,13 +2443,15 @@ class scope(slots_getstate_setstate):
         return self.customized_copy(objects=result)
 
     def unique(self):
-        selection = {}
+        # walk backwards so the first object seen for a name is the last one
+        seen = set()
         result = []
-        for i_object, object in enumerate(self.active_objects()):
-            selection[object.name] = i_object
-        for i_object, object in enumerate(self.active_objects()):
-            if selection[object.name] == i_object:
-                result.append(object.unique())
+        for object in reversed(self.active_objects_list()):
+            if object.name in seen:
+                continue
+            seen.add(object.name)
+            result.append(object.unique())
+        result.reverse()
         return self.customized_copy(objects=result)
 
     def command_line_argument_interpreter(
@@ -2159,6 +2537,16 @@ class variable_substitution_fragment(slots_getstate_setstate):
         self.value = value
 
 
+# Fragments of a word subject to variable substitution: literal text (an
+# escaped \$ stays part of it), $(name), $name, or a $ that starts neither.
+_variable_substitution_token = re.compile(
+    r"(?P<literal>(?:\\\$|[^$])+)"
+    r"|\$\((?P<enclosed>[^)]*)\)"
+    r"|\$(?P<name>[A-Za-z_][A-Za-z_0-9]*)"
+    r"|(?P<error>\$)"
+)
+
+
 class variable_substitution_proxy(slots_getstate_setstate):
 
     __slots__ = ["word", "force_string", "have_variables", "fragments"]
@@ -2168,66 +2556,30 @@ class variable_substitution_proxy(slots_getstate_setstate):
         self.force_string = word.quote_token is not None
         self.have_variables = False
         self.fragments = []
-        fragment_value = ""
-        char_iter = tokenizer.character_iterator(word.value)
-        c = next(char_iter)
-        while c is not None:
-            if c != "$":
-                fragment_value += c
-                if c == "\\" and char_iter.look_ahead_1() == "$":
-                    fragment_value += next(char_iter)
-                c = next(char_iter)
-            else:
-                self.have_variables = True
-                if len(fragment_value) > 0:
-                    self.fragments.append(
-                        variable_substitution_fragment(
-                            is_variable=False, value=fragment_value
-                        )
-                    )
-                    fragment_value = ""
-                c = next(char_iter)
-                if c is None:
+        value = word.value
+        for match in _variable_substitution_token.finditer(value):
+            literal, enclosed, name, error = match.groups()
+            if literal is not None:
+                self.fragments.append(
+                    variable_substitution_fragment(is_variable=False, value=literal)
+                )
+                continue
+            self.have_variables = True
+            if error is not None:
+                following = value[match.end() : match.end() + 1]
+                if following == "":
                     word.raise_syntax_error("$ must be followed by an identifier: ")
-                if c == "(":
-                    while True:
-                        c = next(char_iter)
-                        if c is None:
-                            word.raise_syntax_error('missing ")": ')
-                        if c == ")":
-                            c = next(char_iter)
-                            break
-                        fragment_value += c
-                    offs = int(fragment_value.startswith("."))
-                    if not is_standard_identifier(fragment_value[offs:]):
-                        word.raise_syntax_error("improper variable name ")
-                    self.fragments.append(
-                        variable_substitution_fragment(
-                            is_variable=True, value=fragment_value
-                        )
-                    )
-                else:
-                    if c not in standard_identifier_start_characters:
-                        word.raise_syntax_error("improper variable name ")
-                    fragment_value = c
-                    while True:
-                        c = next(char_iter)
-                        if c is None:
-                            break
-                        if c == ".":
-                            break
-                        if c not in standard_identifier_continuation_characters:
-                            break
-                        fragment_value += c
-                    self.fragments.append(
-                        variable_substitution_fragment(
-                            is_variable=True, value=fragment_value
-                        )
-                    )
-                fragment_value = ""
-        if len(fragment_value) > 0:
+                if following == "(":
+                    word.raise_syntax_error('missing ")": ')
+                word.raise_syntax_error("improper variable name ")
+            if enclosed is not None:
+                offs = int(enclosed.startswith("."))
+                if not is_standard_identifier(enclosed[offs:]):
+                    word.raise_syntax_error("improper variable name ")
+                name = enclosed
+            # variable names repeat across a file; intern them once here
             self.fragments.append(
-                variable_substitution_fragment(is_variable=False, value=fragment_value)
+                variable_substitution_fragment(is_variable=True, value=sys.intern(name))
             )
         if len(self.fragments) > 1:
             self.force_string = True
@@ -2239,7 +2591,16 @@ class variable_substitution_proxy(slots_getstate_setstate):
             return self.fragments[0].result
         return [
             tokenizer.word(
-                value="".join([fragment.result.value for fragment in self.fragments]),
+                value="".join(
+                    [
+                        (
+                            fragment.result.value
+                            if fragment.is_variable
+                            else fragment.value
+                        )
+                        for fragment in self.fragments
+                    ]
+                ),
                 quote_token='"',
             )
         ]
@@ -2267,11 +2628,20 @@ def parse(
     assert source_info is None or file_name is None
     if input_string is None:
         assert file_name is not None
-        with open(file_name, encoding="utf-8", errors="ignore") as f:
-            input_string = f.read()
+        # one bulk decode; newlines translated as text mode would
+        with open(file_name, "rb") as f:
+            input_string = f.read().decode("utf-8", errors="ignore")
+        if "\r" in input_string:
+            input_string = input_string.replace("\r\n", "\n").replace("\r", "\n")
     if converter_registry is None:
         converter_registry = default_converter_registry
     result = scope(name="", primary_id=0)
+    # without any "#phil" in the input no comment can be a meta comment,
+    # so the tokenizer can skip the look-ahead after each "#"
+    if "#phil" in input_string:
+        meta_comment = "phil"
+    else:
+        meta_comment = None
     parser.collect_objects(
         word_iterator=tokenizer.word_iterator(
             input_string=input_string,
@@ -2282,7 +2652,7 @@ def parse(
                     unquoted_single_character_words="{}=",
                     contiguous_word_characters="",
                     comment_characters="#",
-                    meta_comment="phil",
+                    meta_comment=meta_comment,
                 ),
                 tokenizer.settings(
                     unquoted_single_character_words="{};", contiguous_word_characters=""
@@ -2362,16 +2732,18 @@ def find_scope(current_phil, scope_name):
     :return: First scope occurence
     :rtype: freephil.scope
     """
-    i = 0
-    while i < len(current_phil.objects):
-        full_path = current_phil.objects[i].full_path()
-        if full_path == scope_name:
-            return current_phil.objects[i]
-        elif scope_name.startswith(full_path + "."):
-            return find_scope(current_phil.objects[i], scope_name)
-        i += 1
-
-    # Should report nothing found?
+    while True:
+        for object in current_phil.objects:
+            full_path = object.full_path()
+            if full_path == scope_name:
+                return object
+            elif scope_name.startswith(full_path + "."):
+                # descend; the remaining siblings are not searched
+                current_phil = object
+                break
+        else:
+            # Should report nothing found?
+            return None
 
 
 def change_default_phil_values(
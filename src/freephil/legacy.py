@@ -35,6 +35,18 @@ def _mangle(name, klass):
     return "_%s%s" % (klass, name)
 
 
+# mangled __slots__ names are a pure function of the class
+_mangled_slots_cache = {}
+
+
+def _mangled_slots(klass):
+    result = _mangled_slots_cache.get(klass)
+    if result is None:
+        result = tuple(_mangle(name, klass.__name__) for name in klass.__slots__)
+        _mangled_slots_cache[klass] = result
+    return result
+
+
 class slots_getstate_setstate(object):
     """
     Implements getstate and setstate for classes with __slots__ defined. Allows an
@@ -61,21 +73,7 @@ class slots_getstate_setstate(object):
         To fix this we manually mangle attributes with the compiler.misc.mangle function
         which does the right name mangling.
         """
-        import warnings
-
-        warning_filters = warnings.filters[:]
-        show_warning = warnings.showwarning
-
-        try:
-            # avoid printing deprecation warning to stderr when loading mangle
-            warnings.simplefilter("ignore")
-        finally:
-            warnings.showwarning = show_warning
-            warnings.filters = warning_filters
-
-        mnames = [_mangle(name, self.__class__.__name__) for name in self.__slots__]
-
-        return dict([(name, getattr(self, name)) for name in mnames])
+        return {name: getattr(self, name) for name in _mangled_slots(self.__class__)}
 
     def __setstate__(self, state):
         for name, value in state.items():
@@ -1,5 +1,8 @@
 # Content in this file falls under the libtbx license
 
+import functools
+import re
+
 from . import tokenizer
 
 standard_identifier_start_characters = set()
@@ -10,20 +13,21 @@ for c in ".0123456789":
     standard_identifier_continuation_characters.add(c)
 
 
+# one or more dot-separated identifiers built from the character sets above
+_standard_identifier = re.compile(
+    r"[A-Za-z_][A-Za-z_0-9]*(?:\.[A-Za-z_][A-Za-z_0-9]*)*"
+)
+
+
 def is_standard_identifier(string):
-    if len(string) == 0:
-        return False
-    if string[0] not in standard_identifier_start_characters:
+    if not isinstance(string, str):
         return False
-    for c in string[1:]:
-        if c not in standard_identifier_continuation_characters:
-            return False
-    sub_strings = string.split(".")
-    if len(sub_strings) > 1:
-        for sub in sub_strings:
-            if not is_standard_identifier(sub):
-                return False
-    return True
+    return _is_standard_identifier_str(string)
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_standard_identifier_str(string):
+    return _standard_identifier.fullmatch(string) is not None
 
 
 def is_plain_none(words):
@@ -42,7 +46,27 @@ def is_plain_auto(words):
     )
 
 
+_unquoted_value_word = re.compile(r"\S+")
+
+
 def tokenize_value_literal(input_string, source_info):
+    if '"' not in input_string and "'" not in input_string:
+        # without quotes the tokenizer simply splits at whitespace
+        result = []
+        line_number = 1
+        position = 0
+        for match in _unquoted_value_word.finditer(input_string):
+            start = match.start()
+            line_number += input_string.count("\n", position, start)
+            position = start
+            result.append(
+                tokenizer.word(
+                    value=match.group(),
+                    line_number=line_number,
+                    source_info=source_info,
+                )
+            )
+        return result
     return list(
         tokenizer.word_iterator(
             input_string=input_string,
@@ -5,6 +5,7 @@ import os
 import pickle
 import re
 import sys
+import tokenize
 import warnings
 from io import StringIO
 
@@ -117,6 +118,13 @@ class recycle:
                 raise RuntimeError("out_out != self.out")
 
 
+def test_is_standard_identifier():
+    for string in ["a", "a.b", "_x1.y_2"]:
+        assert freephil.is_standard_identifier(string)
+    for string in ["", "1a", "a.", ".a", "a..b", "a-b", None, 1, ["a", "b"]]:
+        assert not freephil.is_standard_identifier(string)
+
+
 def test_parse_and_show():
     for input_string in ["", "\n", "   \n", "   \t \n \t ", "#", "\t#"]:
         recycle(input_string=input_string, expected_out="")
@@ -547,6 +555,8 @@ def test_syntax_errors():
         "a. 2", 'Syntax error: improper definition name "a." (input line 1)'
     )
     _test_exception("a.include=None", 'Reserved identifier: "include" (input line 1)')
+    _test_exception("include.a=None", 'Reserved identifier: "include" (input line 1)')
+    _test_exception("a.include.b=None", 'Reserved identifier: "include" (input line 1)')
     _test_exception("include {}", 'Reserved identifier: "include" (input line 1)')
     _test_exception("a.include.b.c {}", 'Reserved identifier: "include" (input line 1)')
     _test_exception("__foo__=None", 'Reserved identifier: "__foo__" (input line 1)')
@@ -1317,6 +1327,38 @@ a0 {
         "a0.d2",
     ]:
         assert params.get(path).objects[0].full_path() == path
+    x = params.get("a0.a1.t0.t1.x").objects[0]
+    assert x.full_path() == "a0.a1.t0.t1.x"
+    outer = freephil.parse("o { }")
+    t1 = params.get("a0.a1.t0.t1", with_substitution=False).objects[0]
+    outer.objects[0].adopt(t1)
+    assert x.full_path() == "o.t1.x"
+    # direct writes to name, alias and primary_parent_scope of scopes
+    p = freephil.parse("a { b { c = 1 } }\nd { }")
+    a, d = p.objects
+    b = a.objects[0]
+    assert b.full_path() == "a.b"
+    assert b.alias_path() is None
+    a.name = "z"
+    assert b.full_path() == "z.b"
+    a.alias = "al"
+    assert b.alias_path() == "al.b"
+    b.primary_parent_scope = d
+    assert b.full_path() == "d.b"
+    # and of definitions
+    p = freephil.parse("a { c = 1 }\nd { }")
+    a, d = p.objects
+    c = a.objects[0]
+    assert c.full_path() == "a.c"
+    assert c.alias_path() is None
+    a.alias = "al"
+    assert c.alias_path() == "al.c"
+    c.alias = "cc"
+    assert c.alias_path() == "cc"
+    c.name = "e"
+    assert c.full_path() == "a.e"
+    c.primary_parent_scope = d
+    assert c.full_path() == "d.e"
 
 
 def test_include(tmp_path):
@@ -3968,6 +4010,29 @@ s {
 }
 """,
     )
+    # an invalid master value is reported even if the source does not change it
+    master = freephil.parse("a = -1.5\n  .type = float(value_min=1.0)")
+    with pytest.raises(RuntimeError, match="less than the minimum allowed value"):
+        master.fetch_diff(source=freephil.parse("a = -1.5"))
+
+
+class _case_insensitive_environ(dict):
+    # mimics os.environ on Windows
+    def __init__(self, items):
+        super().__init__((key.upper(), value) for key, value in items.items())
+
+    def get(self, key, default=None):
+        return super().get(key.upper(), default)
+
+
+def test_fetch_environ(monkeypatch):
+    # environment variables are looked up through os.environ itself
+    master = freephil.parse("a = None\n  .type = str")
+    source = freephil.parse("a = $_x_y_z_")
+    with monkeypatch.context() as m:
+        m.setattr(os, "environ", _case_insensitive_environ({"_x_y_z_": "xyz"}))
+        f = master.fetch(source=source)
+    assert f.extract().a == "xyz"
 
 
 def test_extract():
@@ -5860,6 +5925,111 @@ a=None
         raise Exception_expected
 
 
+class path_plugin_converters(freephil.path_converters):
+
+    phil_type = "path"
+
+
+class _stub_entry_point:
+    def load(self):
+        return path_plugin_converters
+
+
+def test_converter_plugin_precedence(monkeypatch):
+    monkeypatch.setattr(
+        freephil.common, "_converter_entry_points", lambda: [_stub_entry_point()]
+    )
+    builtins = {"path": freephil.path_converters, "int": freephil.int_converters}
+    # a plugin overriding a built-in applies whatever is looked up first
+    for first in ["path", "int"]:
+        registry = freephil.common._lazy_converter_registry(dict(builtins))
+        registry[first]
+        assert registry["path"] is path_plugin_converters
+        assert registry["int"] is freephil.int_converters
+    registry = freephil.common._lazy_converter_registry(dict(builtins))
+    params = freephil.parse("a = x\n  .type = path", converter_registry=registry)
+    assert isinstance(params.objects[0].type, path_plugin_converters)
+    # the registry can be modified; assignments take precedence over plugins
+    registry = freephil.common._lazy_converter_registry(dict(builtins))
+    registry["path"] = freephil.str_converters
+    assert registry["path"] is freephil.str_converters
+    del registry["int"]
+    assert "int" not in registry
+    assert registry.copy() == {"path": freephil.str_converters}
+
+
+class _broken_entry_point:
+    def load(self):
+        raise ImportError("broken plugin")
+
+
+def test_converter_plugin_error(monkeypatch):
+    monkeypatch.setattr(
+        freephil.common, "_converter_entry_points", lambda: [_broken_entry_point()]
+    )
+    registry = freephil.common._lazy_converter_registry(
+        {"int": freephil.int_converters}
+    )
+    # a failing plugin is reported by every lookup, not only the first
+    for _ in range(2):
+        with pytest.raises(ImportError, match="broken plugin"):
+            registry["int"]
+
+
+def test_converter_cache(monkeypatch):
+    monkeypatch.setattr(freephil.common, "_converter_cache_size", 4)
+
+    def converters(value, cache):
+        return freephil.definition_converters_from_words(
+            words=[freephil.tokenizer.word(value=value)],
+            converter_registry=freephil.default_converter_registry,
+            converter_cache=cache,
+        )
+
+    # a plain dict is accepted; raw and normalized expressions take one entry each
+    cache = {}
+    int1 = converters("int( value_min=1 )", cache)
+    assert list(cache) == ["int(value_min=1)", "int( value_min=1 )"]
+    assert converters("int(value_min=1)", cache) is int1
+    assert list(cache) == ["int( value_min=1 )", "int(value_min=1)"]
+    converters("int( value_min=2 )", cache)
+    assert len(cache) == 4
+    # a hit makes the entry most recently used, the oldest entry is evicted
+    assert converters("int( value_min=1 )", cache) is int1
+    converters("int(value_min=3)", cache)
+    assert list(cache) == [
+        "int(value_min=2)",
+        "int( value_min=2 )",
+        "int( value_min=1 )",
+        "int(value_min=3)",
+    ]
+
+
+def test_normalize_call_expression():
+    for expression, expected in [
+        ("int", "int"),
+        ("int( value_min = 0 , value_max=10 )", "int(value_min=0, value_max=10)"),
+        ("float(value_min=1e-3,value_max=.5)", "float(value_min=1e-3, value_max=.5)"),
+        ("libtbx.phil.tst.check(a=1,b='x, y')", "libtbx.phil.tst.check(a=1, b='x, y')"),
+        ('foo2(bar="a  b")', 'foo2(bar="a  b")'),
+        ("f(x=0x1F, y=1_000, z=3j)", "f(x=0x1F, y=1_000, z=3j)"),
+        ("f(a=[1,2,(3,4)])", "f(a=[1, 2, (3, 4)])"),
+        ("f(a={'k':2**3})", "f(a={'k':2**3})"),
+        ("f(a=-1.5E+10)", "f(a=-1.5E+10)"),
+        ("f(a=r'\\d+')", "f(a=r'\\d+')"),
+        ("foo(a=b if c else d)", "foo(a=b if c else d)"),
+        ("f(a=1<=2, b=x!=y)", "f(a=1<=2, b=x!=y)"),
+        ("f(a= lambda x: x)", "f(a=lambda x:x)"),
+        ("x .y", "x.y"),
+        ("", ""),
+    ]:
+        assert freephil.normalize_call_expression(expression) == expected
+    for expression in ["int(value_min=0", "int(value_min=0))"]:
+        with pytest.raises(tokenize.TokenError) as e:
+            freephil.normalize_call_expression(expression)
+        assert e.value.args == ("EOF in multi-line statement", (2, 0))
+
+
 def test_auto():
     for nao in [None, freephil.Auto]:
         na = str(nao)  # noqa
@@ -6966,6 +7136,16 @@ strategy = *xyz *adp tls
     w2 = master.fetch(source=user3)
     assert warn.n == 2
     assert warn.message == "strategy is deprecated - not recommended for use."
+    # a deprecated .multiple definition set to its default is dropped
+    master = freephil.parse(
+        """\
+a = 1
+  .type = int
+  .multiple = True
+  .deprecated = True
+"""
+    )
+    assert master.fetch(source=freephil.parse("a = 1")).as_str() == ""
 
 
 def test_find_scope():
@@ -7272,7 +7452,7 @@ a
         assert diff == result
 
 
-def test_change_default():
+def test_change_default(tmp_path):
     # master phil
     master_phil_str = """
 scope {
@@ -7307,3 +7487,13 @@ scope {
         new_phil_str = freephil.change_default_phil_values(
             master_phil_str, new_default_str
         )
+
+    # included files are re-read on every call
+    include_file = tmp_path / "x.phil"
+    include_file.write_text("a = 1\n  .type = int\n")
+    master_phil_str = f"include file {include_file}"
+    new_phil_str = freephil.change_default_phil_values(master_phil_str, "a = 2")
+    assert freephil.parse(new_phil_str).extract().a == 2
+    include_file.write_text("a = 1\n  .type = int\nb = 3\n  .type = int\n")
+    new_phil_str = freephil.change_default_phil_values(master_phil_str, "b = 5")
+    assert freephil.parse(new_phil_str).extract().b == 5
@@ -2,7 +2,7 @@
 
 import pickle
 
-from freephil import tokenizer
+from freephil import tokenizer, tokens
 
 
 def test_basic():
@@ -64,3 +64,16 @@ def test_pickle():
     o = tokenizer.word_iterator(input_string="all")
     l = pickle.loads(pickle.dumps(o))
     assert l.char_iter.input_string == "all"
+
+
+def test_tokenize_value_literal():
+    for input_string in ["", "a b\n c\n\n\nd  ", "1;2,3\n4", "a=b {c} #d", 'x "y z"']:
+        expected = tokenizer.word_iterator(
+            input_string=input_string,
+            source_info="si",
+            list_of_settings=[tokenizer.settings(contiguous_word_characters="")],
+        )
+        result = tokens.tokenize_value_literal(input_string, source_info="si")
+        assert [
+            (w.value, w.quote_token, w.line_number, w.source_info) for w in result
+        ] == [(w.value, w.quote_token, w.line_number, w.source_info) for w in expected]